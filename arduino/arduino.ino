@@ -2,7 +2,7 @@
 
 // Serial communication variables
 
-const byte buffSize = 40;
+const byte buffSize = 64;
 char inputBuffer[buffSize];
 const char startMarker = '<';
 const char endMarker = '>';
@@ -12,6 +12,20 @@ boolean newDataFromPC = false;
 char axis[buffSize] = {0};
 char direct[buffSize] = {0};
 
+// Compound move <M,axis,dir,steps,axis,dir,steps,...> executed in order
+const byte maxMultiMoves = 3;
+char multiAxis[maxMultiMoves];
+char multiDirect[maxMultiMoves][2];
+long multiSteps[maxMultiMoves];
+byte multiCount = 0;
+byte multiDone = 0;  // moves finished before a limit switch stopped the sequence
+
+// Set when the last single-axis move hit a limit switch; reported in replyToPC
+bool limitHit = false;
+
+// Set by an explicit <e> command; otherwise moves enable the drivers only while running
+bool motorsHeld = false;
+
 uint8_t STEP_X = 2;
 
 uint8_t STEP_Y = 3;
@@ -107,7 +121,7 @@ digitalWrite(EnablePin, HIGH);  //motors off - start with motors disabled to red
 
   // Limit switches are low when triggered
   
-  Serial.begin(115200);  //115200
+  Serial.begin(1000000);  //1 Mbaud - must match BAUD_RATE in motor_controller.py
   Serial.print("Arduino is ready\r");
 }
 
@@ -116,7 +130,7 @@ int i = 0;
 bool stopped = false;
 int ti = 0;
 // String commandin;
-int steps;
+long steps;
 //String response;
 
 void loop() {
@@ -140,7 +154,7 @@ void loop() {
 
 //===========================================
 
-void movex()
+bool movex()  // returns true if the x limit switch was hit
 {
 //Serial.print(bool(stopped));
   //if (!stopped) {
@@ -180,13 +194,15 @@ void movex()
                 }
       
       stopped = false;
+      return true;
   //  }
   }
+  return false;
 } //movex end
 
 //=================
 
-void movey()
+bool movey()  // returns true if the y limit switch was hit
 //Last update 7/6/21
 {
   //Serial.print(bool(stopped));
@@ -224,12 +240,14 @@ void movey()
                 }
       
       stopped = false;
+      return true;
   //  }
   }
+  return false;
   } //movey end
 //=================
 
-void movez()
+bool movez()  // returns true if the z limit switch was hit
 {
    if (strcmp(direct, "-") == 0) {
     z_axis.move(steps*-1); //z axis has opposite of x and y if positive motion is away from motor
@@ -260,7 +278,9 @@ void movez()
                   }  
                 }
       stopped = false;    
+      return true;
   }
+  return false;
 }//movez end
 
 //==========================================
@@ -478,11 +498,30 @@ void parseData() {
   strtokIndx = strtok(inputBuffer,",");      // get the first part - the string
   strcpy(axis, strtokIndx); // 
 
+  if (strcmp(axis, "M") == 0) {
+    // compound move: read (axis, direction, steps) triples until the buffer runs out
+    multiCount = 0;
+    while (multiCount < maxMultiMoves) {
+      char * axisTok = strtok(NULL, ",");
+      char * dirTok = strtok(NULL, ",");
+      char * stepsTok = strtok(NULL, ",");
+      if (axisTok == NULL || dirTok == NULL || stepsTok == NULL) {
+        break;
+      }
+      multiAxis[multiCount] = axisTok[0];
+      multiDirect[multiCount][0] = dirTok[0];
+      multiDirect[multiCount][1] = 0;
+      multiSteps[multiCount] = atol(stepsTok);
+      multiCount ++;
+    }
+    return;
+  }
+
   strtokIndx = strtok(NULL,",");      
   strcpy(direct, strtokIndx);
   
   strtokIndx = strtok(NULL, ","); // this continues where the previous call left off
-  steps = atoi(strtokIndx);     // convert this part to an integer
+  steps = atol(strtokIndx);     // convert this part to an integer
   
 }
 
@@ -490,12 +529,24 @@ void parseData() {
 
 void replyToPC() {
 
+  if (newDataFromPC && strcmp(axis, "M") == 0) {
+    newDataFromPC = false;
+      Serial.print(axis);
+      Serial.print(multiDone);
+      if (multiDone < multiCount) {
+        Serial.print(" limit reached");  // remaining moves were skipped
+      }
+      Serial.println("\n");
+  }
   if (newDataFromPC) {
     newDataFromPC = false;
  // if (digitalRead(LimX) == HIGH && digitalRead(LimY) == HIGH && digitalRead(LimZ) == HIGH){
       Serial.print(axis);
       Serial.print(direct);
       Serial.print(steps);
+      if (limitHit) {
+        Serial.print(" limit reached");  // same report as a compound move
+      }
       Serial.println("\n");
   }
   /* else { //A limit switch is activated requiring further instruction
@@ -510,15 +561,27 @@ void replyToPC() {
 
 void select_movement() {  //Can modify this to call move functions
   if (newDataFromPC) {
+   limitHit = false;
    // this illustrates using different inputs to call different functions
   if (strcmp(axis, "x") == 0) {
-      movex();
+      begin_move();
+      limitHit = movex();
+      end_move();
   }
   else if (strcmp(axis, "y") == 0) {
-     movey();
+     begin_move();
+     limitHit = movey();
+     end_move();
   }
   else if (strcmp(axis, "z") == 0) {
-    movez();
+    begin_move();
+    limitHit = movez();
+    end_move();
+  }
+  else if (strcmp(axis, "M") == 0) {
+     begin_move();
+     move_multi();
+     end_move();
   }
   else if (strcmp(axis, "h") == 0) {
      HomeMotors();
@@ -534,7 +597,49 @@ void select_movement() {  //Can modify this to call move functions
 
 //==================
 
+void move_multi() {
+  // run each queued axis move through the single-axis routines, stopping at the first limit
+  multiDone = 0;
+  for (byte i = 0; i < multiCount; i++) {
+    strcpy(direct, multiDirect[i]);
+    steps = multiSteps[i];
+    bool limitHit = false;
+    if (multiAxis[i] == 'x') {
+      limitHit = movex();
+    }
+    else if (multiAxis[i] == 'y') {
+      limitHit = movey();
+    }
+    else if (multiAxis[i] == 'z') {
+      limitHit = movez();
+    }
+    if (limitHit) {
+      return;
+    }
+    multiDone ++;
+  }
+}
+
+//==================
+
+void begin_move() {
+  if (!motorsHeld) {
+    digitalWrite(EnablePin, LOW);  // enable just for this move
+  }
+}
+
+//==================
+
+void end_move() {
+  if (!motorsHeld) {
+    digitalWrite(EnablePin, HIGH);  // back off to reduce noise
+  }
+}
+
+//==================
+
 void enable_motors() {
+  motorsHeld = true;
   digitalWrite(EnablePin, LOW);  // LOW enables motors
   Serial.print("Motors enabled\n");
 }
@@ -542,6 +647,7 @@ void enable_motors() {
 //==================
 
 void disable_motors() {
+  motorsHeld = false;
   digitalWrite(EnablePin, HIGH);  // HIGH disables motors
   Serial.print("Motors disabled\n");
 }
\ No newline at end of file
@@ -2,10 +2,28 @@
 YAML configuration loader with validation for Hydrophone Scanner
 """
 
+import copy
 import yaml
 import os
 import logging
-from typing import Dict
+from typing import Dict, Tuple
+
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+_LOG = logging.getLogger(__name__)
+
+# Validated configs keyed by (absolute path, mtime in ns)
+_CACHE: Dict[Tuple[str, int], Dict] = {}
+
+def _ensure_base_path(config: Dict) -> None:
+    """Create the scan output directory if it doesn't exist"""
+    base_path = config['scan']['base_path']
+    if not os.path.exists(base_path):
+        os.makedirs(base_path)
+        _LOG.info("Created base path directory: %s", base_path)
 
 def validate_config(config: Dict) -> None:
     """Validate configuration values and scan dimensions"""
@@ -21,12 +39,6 @@ def validate_config(config: Dict) -> None:
     if dims['resolution'] <= 0:
         raise ValueError("Resolution must be positive")
         
-    # Check base path exists or create it
-    base_path = config['scan']['base_path']
-    if not os.path.exists(base_path):
-        os.makedirs(base_path)
-        logging.info(f"Created base path directory: {base_path}")
-        
     # Validate scan dimensions based on scan type
     if scan_type.startswith('1d'):
         # For 1D scans, verify only one dimension is non-zero
@@ -63,14 +75,30 @@ def validate_config(config: Dict) -> None:
             raise ValueError(f"2D scan in {axes} plane has wrong dimensions set")
     
 def load_config(config_path: str = "config.yaml") -> Dict:
-    """Load and validate configuration from YAML file"""
+    """Load and validate configuration from YAML file
+    
+    Parsed configs are cached until the file's mtime changes; callers
+    always get their own copy so mutations never leak into the cache.
+    The scan base_path directory is (re)created on every call.
+    """
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            
-        validate_config(config)
-        return config
+        st = os.stat(config_path)
+        key = (os.path.abspath(config_path), st.st_mtime_ns)
+        config = _CACHE.get(key)
+        if config is None:
+            with open(config_path, 'r') as f:
+                config = yaml.load(f, Loader=_Loader)
+                
+            validate_config(config)
+            # Drop entries for older versions of the same file
+            for stale in [k for k in _CACHE if k[0] == key[0]]:
+                del _CACHE[stale]
+            _CACHE[key] = config
+        
+        # On every load, not just on a parse: the directory may have been removed since
+        _ensure_base_path(config)
+        return copy.deepcopy(config)
         
     except Exception as e:
-        logging.error(f"Error loading config: {e}")
+        _LOG.error("Error loading config: %s", e)
         raise
\ No newline at end of file
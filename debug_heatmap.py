@@ -3,7 +3,6 @@
 Debug script to analyze heatmap distortion issues
 """
 
-import csv
 import numpy as np
 import matplotlib.pyplot as plt
 from pathlib import Path
@@ -13,6 +12,53 @@ import os
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+def _load_scan_data(csv_file_path):
+    """Load successful measurements from a scan CSV as NumPy column arrays
+    
+    Missing peak values ('None' or empty) become NaN; rows with unreadable
+    coordinates, unparsable numbers or the wrong number of fields (e.g. a
+    truncated last line from an interrupted scan) are dropped.
+    """
+    with open(csv_file_path, 'r') as f:
+        header = f.readline().strip().split(',')
+        fields = [line.rstrip('\r\n').split(',') for line in f]
+    
+    rows = np.array([row for row in fields if len(row) == len(header)], dtype=str)
+    rows = rows.reshape(-1, len(header))
+    
+    col = {name: rows[:, i] for i, name in enumerate(header)}
+    ok = col['method'] != 'FAILED'
+    bad = np.zeros(int(ok.sum()), dtype=bool)
+    
+    def to_float(values):
+        values = values[ok]
+        present = (values != 'None') & (values != '')
+        parsed = np.full(values.shape, np.nan)
+        try:
+            parsed[present] = values[present].astype(np.float64)
+        except ValueError:
+            # Rare: find the offending cells one by one and drop their rows
+            for i in np.flatnonzero(present):
+                try:
+                    parsed[i] = float(values[i])
+                except ValueError:
+                    bad[i] = True
+        return parsed
+    
+    data = {
+        'point_num': col['point_num'][ok],
+        'x': to_float(col['x_mm']),
+        'y': to_float(col['y_mm']),
+        'z': to_float(col['z_mm']),
+        'pos_peak': to_float(col['positive_peak_v']),
+        'neg_peak': to_float(col['negative_peak_v']),
+    }
+    
+    valid = ~(bad | np.isnan(data['x']) | np.isnan(data['y']) | np.isnan(data['z']))
+    data = {key: values[valid] for key, values in data.items()}
+    data['point_num'] = data['point_num'].astype(np.int32)
+    return data
+
 def analyze_scan_data(csv_file_path):
     """Analyze scan data to identify heatmap issues"""
     
@@ -20,63 +66,51 @@ def analyze_scan_data(csv_file_path):
     print("=" * 60)
     
     # Read the CSV data
-    data = []
-    with open(csv_file_path, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['method'] != 'FAILED':
-                try:
-                    data.append({
-                        'point_num': int(row['point_num']),
-                        'x': float(row['x_mm']),
-                        'y': float(row['y_mm']),
-                        'z': float(row['z_mm']),
-                        'pos_peak': float(row['positive_peak_v']) if row['positive_peak_v'] and row['positive_peak_v'] != 'None' else None,
-                        'neg_peak': float(row['negative_peak_v']) if row['negative_peak_v'] and row['negative_peak_v'] != 'None' else None
-                    })
-                except (ValueError, TypeError):
-                    continue
-    
-    print(f"📊 Total data points: {len(data)}")
+    data = _load_scan_data(csv_file_path)
+    n_points = len(data['point_num'])
+    
+    print(f"📊 Total data points: {n_points}")
     
     # Analyze coordinates
-    x_coords = [d['x'] for d in data]
-    y_coords = [d['y'] for d in data]
+    x_coords = data['x']
+    y_coords = data['y']
+    
+    # Quantize to 0.001 mm so float noise in the logged positions can't split a grid line
+    quanta_per_mm = 1000  # matches the old 0.001 mm tolerance; unrelated to motor steps
+    x_int = np.rint(x_coords * quanta_per_mm).astype(np.int64)
+    y_int = np.rint(y_coords * quanta_per_mm).astype(np.int64)
+    unique_x_int = np.unique(x_int)
+    unique_y_int = np.unique(y_int)
+    unique_x = unique_x_int / quanta_per_mm
+    unique_y = unique_y_int / quanta_per_mm
+    x_idx = np.searchsorted(unique_x_int, x_int)
+    y_idx = np.searchsorted(unique_y_int, y_int)
     
     print(f"\n📍 Coordinate Analysis:")
-    print(f"  X range: {min(x_coords):.3f} to {max(x_coords):.3f} mm")
-    print(f"  Y range: {min(y_coords):.3f} to {max(y_coords):.3f} mm")
-    print(f"  Unique X values: {sorted(set(x_coords))}")
-    print(f"  Unique Y values: {sorted(set(y_coords))}")
+    print(f"  X range: {x_coords.min():.3f} to {x_coords.max():.3f} mm")
+    print(f"  Y range: {y_coords.min():.3f} to {y_coords.max():.3f} mm")
+    print(f"  Unique X values: {unique_x.tolist()}")
+    print(f"  Unique Y values: {unique_y.tolist()}")
     
     # Check for expected grid pattern
-    unique_x = sorted(set(x_coords))
-    unique_y = sorted(set(y_coords))
     expected_points = len(unique_x) * len(unique_y)
     
     print(f"\n🔧 Grid Analysis:")
     print(f"  Expected grid: {len(unique_x)} x {len(unique_y)} = {expected_points} points")
-    print(f"  Actual points: {len(data)}")
-    print(f"  Match: {'✅' if len(data) == expected_points else '❌'}")
+    print(f"  Actual points: {n_points}")
+    print(f"  Match: {'✅' if n_points == expected_points else '❌'}")
     
     # Check scan order and pattern
     print(f"\n📋 Scan Pattern Analysis:")
     print("  First 10 points:")
-    for i in range(min(10, len(data))):
-        d = data[i]
-        print(f"    Point {d['point_num']}: X={d['x']:.3f}, Y={d['y']:.3f}")
+    for i in range(min(10, n_points)):
+        print(f"    Point {data['point_num'][i]}: X={x_coords[i]:.3f}, Y={y_coords[i]:.3f}")
     
     # Check for missing data points
-    missing_points = []
-    for x in unique_x:
-        for y in unique_y:
-            found = False
-            for d in data:
-                if abs(d['x'] - x) < 0.001 and abs(d['y'] - y) < 0.001:
-                    found = True
-                    break
-            if not found:
-                missing_points.append((x, y))
+    filled = np.zeros((len(unique_x), len(unique_y)), dtype=bool)
+    filled[x_idx, y_idx] = True
+    missing_x, missing_y = np.nonzero(~filled)
+    missing_points = list(zip(unique_x[missing_x].tolist(), unique_y[missing_y].tolist()))
     
     if missing_points:
         print(f"\n⚠️  Missing data points: {len(missing_points)}")
@@ -87,36 +121,32 @@ def analyze_scan_data(csv_file_path):
     
     # Check for coordinate precision issues
     print(f"\n🔍 Coordinate Precision Check:")
-    x_diffs = []
-    y_diffs = []
+    x_diffs = np.diff(unique_x_int)
+    y_diffs = np.diff(unique_y_int)
     
-    for i in range(len(unique_x) - 1):
-        x_diffs.append(unique_x[i+1] - unique_x[i])
-    for i in range(len(unique_y) - 1):
-        y_diffs.append(unique_y[i+1] - unique_y[i])
+    if x_diffs.size:
+        print(f"  X increments: {(x_diffs / quanta_per_mm).tolist()}")
+        print(f"  X increment consistency: {'✅' if np.all(x_diffs == x_diffs[0]) else '❌'}")
     
-    if x_diffs:
-        print(f"  X increments: {x_diffs}")
-        print(f"  X increment consistency: {'✅' if len(set([round(d, 6) for d in x_diffs])) == 1 else '❌'}")
-    
-    if y_diffs:
-        print(f"  Y increments: {y_diffs}")
-        print(f"  Y increment consistency: {'✅' if len(set([round(d, 6) for d in y_diffs])) == 1 else '❌'}")
+    if y_diffs.size:
+        print(f"  Y increments: {(y_diffs / quanta_per_mm).tolist()}")
+        print(f"  Y increment consistency: {'✅' if np.all(y_diffs == y_diffs[0]) else '❌'}")
     
     # Analyze voltage data
-    pos_peaks = [d['pos_peak'] for d in data if d['pos_peak'] is not None]
-    neg_peaks = [d['neg_peak'] for d in data if d['neg_peak'] is not None]
+    has_neg = ~np.isnan(data['neg_peak'])
+    pos_peaks = data['pos_peak'][~np.isnan(data['pos_peak'])]
+    neg_peaks = data['neg_peak'][has_neg]
     
     print(f"\n📊 Voltage Data Analysis:")
-    if pos_peaks:
-        print(f"  Positive peaks: {len(pos_peaks)} values")
-        print(f"    Range: {min(pos_peaks):.6f}V to {max(pos_peaks):.6f}V")
-        print(f"    Mean: {np.mean(pos_peaks):.6f}V")
+    if pos_peaks.size:
+        print(f"  Positive peaks: {pos_peaks.size} values")
+        print(f"    Range: {pos_peaks.min():.6f}V to {pos_peaks.max():.6f}V")
+        print(f"    Mean: {pos_peaks.mean():.6f}V")
     
-    if neg_peaks:
-        print(f"  Negative peaks: {len(neg_peaks)} values")
-        print(f"    Range: {min(neg_peaks):.6f}V to {max(neg_peaks):.6f}V")
-        print(f"    Mean: {np.mean(neg_peaks):.6f}V")
+    if neg_peaks.size:
+        print(f"  Negative peaks: {neg_peaks.size} values")
+        print(f"    Range: {neg_peaks.min():.6f}V to {neg_peaks.max():.6f}V")
+        print(f"    Mean: {neg_peaks.mean():.6f}V")
     
     # Create diagnostic plots
     print(f"\n📈 Creating diagnostic plots...")
@@ -129,7 +159,7 @@ def analyze_scan_data(csv_file_path):
     plt.plot(x_coords, y_coords, 'ro', markersize=3)
     
     # Number the first few points to show scan order
-    for i in range(min(20, len(data))):
+    for i in range(min(20, n_points)):
         plt.annotate(str(i+1), (x_coords[i], y_coords[i]), 
                     xytext=(5, 5), textcoords='offset points', fontsize=8)
     
@@ -142,19 +172,12 @@ def analyze_scan_data(csv_file_path):
     # Plot 2: Negative peak heatmap recreation
     plt.subplot(1, 2, 2)
     
-    if neg_peaks:
+    if neg_peaks.size:
         # Create grid manually to debug
         grid = np.full((len(unique_y), len(unique_x)), np.nan)
-        x_to_idx = {x: i for i, x in enumerate(unique_x)}
-        y_to_idx = {y: i for i, y in enumerate(unique_y)}
-        
-        for d in data:
-            if d['neg_peak'] is not None:
-                x_idx = x_to_idx[d['x']]
-                y_idx = y_to_idx[d['y']]
-                grid[y_idx, x_idx] = d['neg_peak']
+        grid[y_idx[has_neg], x_idx[has_neg]] = neg_peaks
         
-        extent = (min(unique_x), max(unique_x), min(unique_y), max(unique_y))
+        extent = (unique_x[0], unique_x[-1], unique_y[0], unique_y[-1])
         im = plt.imshow(grid, extent=extent, origin='lower', 
                        cmap='RdYlBu_r', interpolation='nearest')
         plt.colorbar(im, label='Negative Peak (V)')
@@ -4,73 +4,81 @@ USB Connection Lister
 Lists all USB devices and serial ports on macOS
 """
 
+import functools
+import glob
+from concurrent.futures import ThreadPoolExecutor
+import plistlib
 import subprocess
 import sys
 import re
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
-def run_command(cmd: str) -> str:
-    """Run a shell command and return the output"""
+_PRODUCT_RE = re.compile(r'"USB Product Name" = "([^"]+)"')
+_VENDOR_RE = re.compile(r'"USB Vendor Name" = "([^"]+)"')
+
+def run_command(argv: List[str]) -> str:
+    """Run a command (argv list, no shell) and return the output"""
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = subprocess.run(argv, capture_output=True, text=True, check=False)
         return result.stdout
     except Exception as e:
         return f"Error running command: {e}"
 
+# system_profiler plist keys -> device dict keys
+_USB_FIELDS = {
+    'product_id': 'product_id',
+    'vendor_id': 'vendor_id',
+    'bcd_device': 'version',
+    'serial_num': 'serial',
+    'manufacturer': 'manufacturer',
+    'location_id': 'location',
+}
+
+def _collect_usb_devices(items: List[Dict], devices: List[Dict]) -> None:
+    """Walk the nested '_items' tree, keeping every entry that has a product ID"""
+    for item in items:
+        if 'product_id' in item:
+            devices.append({key: str(item[field]) for field, key in _USB_FIELDS.items() if field in item})
+        _collect_usb_devices(item.get('_items', []), devices)
+
 def list_usb_devices() -> List[Dict]:
     """List all USB devices using system_profiler"""
     print("🔍 Scanning USB devices...")
     
-    # Get detailed USB information
-    usb_info = run_command("system_profiler SPUSBDataType")
+    # Get detailed USB information as a property list instead of scraping the text report
+    try:
+        result = subprocess.run(["system_profiler", "-xml", "SPUSBDataType"], capture_output=True)
+        usb_info = plistlib.loads(result.stdout)
+    except Exception as e:
+        print(f"⚠️  Could not read USB devices: {e}")
+        return []
     
     devices = []
-    current_device = {}
-    
-    for line in usb_info.split('\n'):
-        line = line.strip()
-        
-        if line.startswith('Product ID:'):
-            if current_device:
-                devices.append(current_device)
-            current_device = {'product_id': line.split(':', 1)[1].strip()}
-        elif line.startswith('Vendor ID:'):
-            current_device['vendor_id'] = line.split(':', 1)[1].strip()
-        elif line.startswith('Version:'):
-            current_device['version'] = line.split(':', 1)[1].strip()
-        elif line.startswith('Serial Number:'):
-            current_device['serial'] = line.split(':', 1)[1].strip()
-        elif line.startswith('Manufacturer:'):
-            current_device['manufacturer'] = line.split(':', 1)[1].strip()
-        elif line.startswith('Location ID:'):
-            current_device['location'] = line.split(':', 1)[1].strip()
-    
-    if current_device:
-        devices.append(current_device)
+    for report in usb_info:
+        _collect_usb_devices(report.get('_items', []), devices)
     
     return devices
 
 def list_serial_ports() -> List[str]:
-    """List all serial ports using ls command"""
+    """List all serial ports by globbing /dev"""
     print("🔍 Scanning serial ports...")
     
-    # List all tty devices
-    tty_devices = run_command("ls /dev/tty.*")
-    usb_devices = run_command("ls /dev/cu.*")
-    
-    serial_ports = []
-    
-    # Parse tty devices
-    for line in tty_devices.split('\n'):
-        if line.strip() and 'tty.' in line:
-            serial_ports.append(line.strip())
-    
-    # Parse cu devices (Callout devices)
-    for line in usb_devices.split('\n'):
-        if line.strip() and 'cu.' in line:
-            serial_ports.append(line.strip())
-    
-    return serial_ports
+    # tty devices first, then cu (callout) devices, each sorted like ls output
+    return sorted(glob.glob('/dev/tty.*')) + sorted(glob.glob('/dev/cu.*'))
+
+@functools.lru_cache(maxsize=1)
+def _ioreg_lines() -> Tuple[str, ...]:
+    """Dump the IOUSB registry once per run; every port lookup searches this copy"""
+    return tuple(run_command(["ioreg", "-p", "IOUSB", "-l", "-w", "0"]).splitlines())
+
+def _ioreg_context(needle: str, context: int = 10) -> str:
+    """Return the ioreg lines within `context` lines of any line containing needle (like grep -A/-B)"""
+    lines = _ioreg_lines()
+    keep = set()
+    for i, line in enumerate(lines):
+        if needle in line:
+            keep.update(range(max(0, i - context), min(len(lines), i + context + 1)))
+    return '\n'.join(lines[i] for i in sorted(keep))
 
 def get_device_info(port: str) -> Dict:
     """Get detailed information about a serial port"""
@@ -81,15 +89,15 @@ def get_device_info(port: str) -> Dict:
         info['type'] = 'USB Serial'
         
         # Try to get more info using ioreg
-        ioreg_output = run_command(f"ioreg -p IOUSB -l -w 0 | grep -A 10 -B 10 '{port}'")
+        ioreg_output = _ioreg_context(port)
         
         # Look for product name
-        product_match = re.search(r'"USB Product Name" = "([^"]+)"', ioreg_output)
+        product_match = _PRODUCT_RE.search(ioreg_output)
         if product_match:
             info['product'] = product_match.group(1)
         
         # Look for vendor name
-        vendor_match = re.search(r'"USB Vendor Name" = "([^"]+)"', ioreg_output)
+        vendor_match = _VENDOR_RE.search(ioreg_output)
         if vendor_match:
             info['vendor'] = vendor_match.group(1)
     
@@ -100,13 +108,27 @@ def get_device_info(port: str) -> Dict:
     
     return info
 
+def _list_visa_resources() -> Tuple[str, ...]:
+    """Enumerate VISA instruments (raises ImportError if PyVISA is missing)"""
+    import pyvisa
+    rm = pyvisa.ResourceManager()
+    return rm.list_resources()
+
 def main():
     print("🚀 USB Connection Lister for macOS")
     print("=" * 50)
     
-    # List USB devices
-    usb_devices = list_usb_devices()
+    # The scans are independent and mostly wait on external tools, so run them together
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        usb_future = executor.submit(list_usb_devices)
+        ports_future = executor.submit(list_serial_ports)
+        ioreg_future = executor.submit(_ioreg_lines)  # warms the cache used by get_device_info
+        visa_future = executor.submit(_list_visa_resources)
+        usb_devices = usb_future.result()
+        serial_ports = ports_future.result()
+        ioreg_future.result()
     
+    # List USB devices
     print(f"\n�� Found {len(usb_devices)} USB devices:")
     print("-" * 50)
     
@@ -117,8 +139,6 @@ def main():
                 print(f"   {key.replace('_', ' ').title()}: {value}")
     
     # List serial ports
-    serial_ports = list_serial_ports()
-    
     print(f"\n�� Found {len(serial_ports)} serial ports:")
     print("-" * 50)
     
@@ -144,9 +164,7 @@ def main():
     
     # Check for oscilloscope (VISA devices)
     try:
-        import pyvisa
-        rm = pyvisa.ResourceManager()
-        visa_devices = rm.list_resources()
+        visa_devices = visa_future.result()
         if visa_devices:
             print(f"✅ Found VISA devices: {visa_devices}")
         else:
@@ -3,34 +3,68 @@ Motor Controller for Hydrophone Scanner
 Handles Arduino communication for stepper motor control.
 """
 
+import re
 import serial
 import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from tqdm import tqdm
 from datetime import datetime
 from pathlib import Path
 
+def _log_timestamp() -> str:
+    """HH:MM:SS.mmm for log lines, built from datetime fields instead of strftime"""
+    now = datetime.now()
+    return f"{now.hour:02d}:{now.minute:02d}:{now.second:02d}.{now.microsecond // 1000:03d}"
+
 class MotorController:
 
+    # Conservative step rate for motion timeouts (firmware max speeds are 700-800 steps/s)
+    MIN_STEP_RATE = 500
+    MOTION_TIMEOUT_MARGIN_S = 2.0
+    # Must match Serial.begin() in arduino/arduino.ino (exact divisor on a 16 MHz Uno)
+    BAUD_RATE = 1000000
+    # Banner printed by the firmware at the end of setup()
+    _READY_MSG = b"Arduino is ready"
+    # Upper bound for the post-reset boot (bootloader + setup()) before the banner appears
+    READY_TIMEOUT_S = 4.0
+    # Fixed firmware commands, pre-encoded
+    _CMD_ENABLE = b"<e,+,0>"
+    _CMD_DISABLE = b"<d,+,0>"
+    _CMD_HOME = b"<h,+,0>"
+    # Firmware echoes each command as axis+direction+steps once it has been handled
+    _ACK_ENABLE = b"e+0"
+    _ACK_DISABLE = b"d+0"
+    ACK_TIMEOUT_S = 0.5
+    # Must match maxMultiMoves in arduino/arduino.ino; extra moves would be dropped by the firmware
+    MAX_MULTI_MOVES = 3
+    # Compound move reply when a limit switch stopped the sequence: 'M<moves finished> limit reached'
+    _MULTI_LIMIT_RE = re.compile(r"M(\d+) limit reached")
+
     def __init__(self, arduino_port: str, scope_address: Optional[str] = None, config: Optional[Dict] = None):
         self.arduino_port = arduino_port
         self.config = config
         self.arduino: Optional[serial.Serial] = None
+        # Bytes read from the port but not yet consumed as a line (see _readline)
+        self._rx_buf = bytearray()
         self.current_position: Dict[str, float] = {'x': 0.0, 'y': 0.0, 'z': 0.0}
         
         # Logging setup - will be initialized when scan starts
         self.log_file = None
+        self._log_handle = None  # kept open for the whole scan, line-buffered
         self.logging_enabled = False
         
         if self.config:
-            self.MM_PER_STEP = {
-                'x': 1 / self.config['hardware']['steps_per_mm']['x'],
-                'y': 1 / self.config['hardware']['steps_per_mm']['y'],
-                'z': 1 / self.config['hardware']['steps_per_mm']['z']
-            }
+            steps_per_mm = self.config['hardware']['steps_per_mm']
+            # Used on every move so the hot path multiplies instead of dividing; taken straight
+            # from the config (need not be an integer), only step counts are rounded
+            self.STEPS_PER_MM = {axis: float(steps_per_mm[axis]) for axis in ('x', 'y', 'z')}
         else:
             # Default values if no config provided
-            self.MM_PER_STEP = {'x': 0.01, 'y': 0.01, 'z': 0.01}
+            self.STEPS_PER_MM = {'x': 100.0, 'y': 100.0, 'z': 100.0}
+        self.MM_PER_STEP = {axis: 1 / steps for axis, steps in self.STEPS_PER_MM.items()}
+        
+        # Pre-encoded '<axis,dir,' prefixes for move_axis, indexed by [axis][distance > 0]
+        self._move_prefix = {axis: (f'<{axis},-,'.encode(), f'<{axis},+,'.encode()) for axis in self.MM_PER_STEP}
 
         self._setup_connections()
 
@@ -41,10 +75,11 @@ class MotorController:
         self.logging_enabled = True
         
         # Write initial log entry
-        initial_message = f"[{datetime.now().strftime('%H:%M:%S.%f')[:-3]}] Motor controller scan logging started - Log file: {self.log_file}"
-        with open(self.log_file, 'w') as f:  # Use 'w' to create new file
-            f.write(initial_message + '\n')
-            f.flush()
+        initial_message = f"[{_log_timestamp()}] Motor controller scan logging started - Log file: {self.log_file}"
+        if self._log_handle:
+            self._log_handle.close()
+        self._log_handle = open(self.log_file, 'w', buffering=1)  # Use 'w' to create new file
+        self._log_handle.write(initial_message + '\n')
         print(f"📝 Motor logging started: {self.log_file}")
 
     def stop_scan_logging(self):
@@ -52,6 +87,9 @@ class MotorController:
         if self.logging_enabled and self.log_file:
             self._log_and_print("Motor controller scan logging ended")
             print(f"📝 Motor logging saved: {self.log_file}")
+        if self._log_handle:
+            self._log_handle.close()
+            self._log_handle = None
         self.logging_enabled = False
         self.log_file = None
 
@@ -61,15 +99,13 @@ class MotorController:
 
     def _log_and_print(self, message: str):
         """Log message to both file and console with timestamp"""
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]  # Include milliseconds
-        formatted_message = f"[{timestamp}] {message}"
+        formatted_message = f"[{_log_timestamp()}] {message}"
         
         # Write to log file only if logging is enabled
-        if self.logging_enabled and self.log_file:
+        if self.logging_enabled and self._log_handle:
             try:
-                with open(self.log_file, 'a') as f:
-                    f.write(formatted_message + '\n')
-                    f.flush()  # Ensure immediate write
+                # Line buffering writes each message through immediately
+                self._log_handle.write(formatted_message + '\n')
             except Exception as e:
                 print(f"Logging error: {e}")
         
@@ -87,28 +123,33 @@ class MotorController:
             print(f"Attempting to connect to port: {self.arduino_port}")
             self.arduino = serial.Serial(
                 port=self.arduino_port,
-                baudrate=115200,
+                baudrate=self.BAUD_RATE,
                 timeout=1
             )
             print(f"Serial port opened successfully: {self.arduino.is_open}")
-            print("Waiting 2 seconds for Arduino to initialize...")
-            time.sleep(2)
-
-            # Try reading multiple times in case Arduino sends multiple lines
-            print("Reading Arduino response...")
-            response = self.arduino.readline().decode().strip()
-            print(f"Arduino response: '{response}'")
-            
-            # If first response is empty, try reading a few more times
-            if not response:
-                print("First response empty, trying to read more...")
-                for i in range(3):
-                    time.sleep(0.5)
-                    additional_response = self.arduino.readline().decode().strip()
-                    print(f"Additional response {i+1}: '{additional_response}'")
-                    if additional_response:
-                        response = additional_response
-                        break
+            # Drop the USB-serial receive latency timer so acks arrive promptly. pyserial
+            # defines this on every POSIX port but only implements it on Linux (macOS raises
+            # NotImplementedError)
+            if hasattr(self.arduino, 'set_low_latency_mode'):
+                try:
+                    self.arduino.set_low_latency_mode(True)
+                except (NotImplementedError, OSError, ValueError):
+                    pass
+            # Windows only: a larger driver queue stops short replies from being held back
+            if hasattr(self.arduino, 'set_buffer_size'):
+                try:
+                    self.arduino.set_buffer_size(rx_size=65536, tx_size=65536)
+                except serial.SerialException:
+                    pass
+            # The board resets when the port opens; collect whatever arrives until the
+            # ready banner shows up instead of sleeping for a fixed boot time
+            print("Waiting for Arduino to initialize...")
+            response = b''
+            deadline = time.time() + self.READY_TIMEOUT_S
+            while self._READY_MSG not in response and time.time() < deadline:
+                response += self.arduino.read(self.arduino.in_waiting or 1)
+            response = response.strip()
+            print(f"Arduino response: '{response.decode('utf-8', errors='ignore')}'")
             
             # Check if we have any data in the buffer
             bytes_waiting = self.arduino.in_waiting
@@ -128,14 +169,22 @@ class MotorController:
                 print("4. Select Board: Arduino Uno (Tools → Board)")
                 print("5. Select Port: /dev/cu.usbmodem1401 (Tools → Port)")
                 print("6. Upload the sketch (Ctrl+U)")
+                print("\nIf a sketch is already uploaded, it is most likely an older build: the host")
+                print(f"talks at {self.BAUD_RATE} baud with the current command protocol, so re-upload")
+                print("arduino/arduino.ino from this checkout.")
                 print("="*60)
-                raise ConnectionError("Arduino firmware not uploaded - see instructions above")
-            elif "Arduino is ready" in response:
+                raise ConnectionError(
+                    f"No ready banner from Arduino - firmware missing or out of date "
+                    f"(baud/firmware mismatch, host expects {self.BAUD_RATE} baud); see instructions above"
+                )
+            elif self._READY_MSG in response:
                 # Ensure motors remain disabled by default on connect
                 self.disable_motors()
                 print("✅ Arduino connected successfully (motors disabled)")
             else:
-                print(f"⚠️  Arduino responded but with unexpected message: '{response}'")
+                print(f"⚠️  Arduino responded but with unexpected message: '{response.decode('utf-8', errors='ignore')}'")
+                print(f"   Garbled output usually means a baud/firmware mismatch (host uses {self.BAUD_RATE} baud) -")
+                print("   re-upload arduino/arduino.ino from this checkout if moves don't respond.")
                 print("Continuing anyway - this might still work...")
 
         except serial.SerialException as e:
@@ -151,43 +200,75 @@ class MotorController:
             self._log_and_print("Arduino not connected")
             return False
 
+        steps = abs(round(distance * self.STEPS_PER_MM[axis]))
+        direction = '+' if distance > 0 else '-'
+        command = self._move_prefix[axis][distance > 0] + b'%d>' % steps
+        
+        # Debug logging
+        self._log_and_print(f"Sending command: {command.decode()} (distance: {distance:+.3f}mm)")
+        
+        # Arduino echoes the command (axis + direction + steps) when done, followed by
+        # " limit reached" if a limit switch stopped the move
+        return self._execute_move(command, f"{axis}{direction}{steps}", steps, [(axis, distance)])
+
+    def move_multi(self, moves: List[Tuple[str, float]]) -> bool:
+        """Move several axes with one compound command, executed in order by the firmware"""
+        if len(moves) > self.MAX_MULTI_MOVES:
+            raise ValueError(f"At most {self.MAX_MULTI_MOVES} moves per compound command, got {len(moves)}")
+        for axis, _ in moves:
+            if axis not in self.MM_PER_STEP:
+                raise ValueError(f"Invalid axis: {axis}")
+        
+        if not self.arduino:
+            self._log_and_print("Arduino not connected")
+            return False
+
+        parts = []
+        total_steps = 0
+        for axis, distance in moves:
+            steps = abs(round(distance * self.STEPS_PER_MM[axis]))
+            direction = b'+' if distance > 0 else b'-'
+            parts.append(b'%s,%s,%d' % (axis.encode(), direction, steps))
+            total_steps += steps
+        command = b'<M,' + b','.join(parts) + b'>'
+        
+        self._log_and_print(f"Sending command: {command.decode()}")
+        
+        # Firmware answers 'M<count>' once every axis has finished, and stops at the first limit
+        return self._execute_move(command, f"M{len(moves)}", total_steps, moves)
+
+    def _execute_move(self, command: bytes, expected_response: str, total_steps: int,
+                      moves: List[Tuple[str, float]]) -> bool:
+        """Send a move command, wait for the firmware's reply and update position tracking
+        
+        The firmware enables the drivers for the move and disables them afterwards.
+        """
         try:
-            # Enable motors before movement
-            self.enable_motors()
-            
-            steps = round(distance / self.MM_PER_STEP[axis])
-            direction = '+' if distance > 0 else '-'
-            command = f"<{axis},{direction},{abs(steps)}>"
-            
-            # Debug logging
-            self._log_and_print(f"Sending command: {command} (distance: {distance:+.3f}mm)")
-            
             # Clear any buffered data before sending command
-            if self.arduino.in_waiting > 0:
-                buffered_data = self.arduino.read_all().decode('utf-8', errors='ignore')
+            buffered_data = self._drain_input()
+            if buffered_data.strip():
                 self._log_and_print(f"Cleared buffer before command: '{buffered_data}'")
             
-            self.arduino.write(command.encode())
-            self.arduino.flush()
+            # No flush(): the echo wait below cannot complete before the command is sent
+            self.arduino.write(command)
             
-            # Wait for movement completion (Arduino will send response)
+            # Wait for movement completion
             try:
-                # Give Arduino time to process and respond
-                time.sleep(0.1)
-                
-                response = self.arduino.readline().decode().strip()
+                timeout = self.MOTION_TIMEOUT_MARGIN_S + total_steps / self.MIN_STEP_RATE
+                response = self.wait_motion_complete(expected_response, timeout)
                 self._log_and_print(f"Arduino response: '{response}'")
                 
-                # Check if response matches expected format (axis + direction + steps)
-                expected_response = f"{axis}{direction}{abs(steps)}"
+                # Check if response matches expected format
                 if response != expected_response:
                     self._log_and_print(f"⚠️  Unexpected response! Expected: '{expected_response}', Got: '{response}'")
                 
                 # Check if response indicates an error or limit switch hit
                 if "limit" in response.lower() or "reached" in response.lower():
                     self._log_and_print(f"⚠️  Limit switch detected during movement!")
-                    # Don't update position tracking if limit was hit
-                    # self.disable_motors()
+                    # Don't update position tracking for the move that hit the limit; a
+                    # compound move reports how many of its moves finished before it
+                    finished = self._MULTI_LIMIT_RE.search(response)
+                    self._track_moves(moves[:int(finished.group(1))] if finished else [])
                     return False
                     
             except Exception as e:
@@ -195,20 +276,85 @@ class MotorController:
                 self.disable_motors()
                 return False
             
-            # Add position tracking
-            old_position = self.current_position[axis]
-            self.current_position[axis] += distance
-            self._log_and_print(f"Position updated: {axis} {old_position:.3f} → {self.current_position[axis]:.3f}mm")
-            
-            # Disable motors after movement to reduce noise
-            self.disable_motors()
-            
+            self._track_moves(moves)
             return True
 
         except serial.SerialException as e:
             self._log_and_print(f"Movement error: {e}")
             return False
 
+    def _track_moves(self, moves: List[Tuple[str, float]]) -> None:
+        """Add completed relative moves to the tracked position"""
+        for axis, distance in moves:
+            old_position = self.current_position[axis]
+            self.current_position[axis] += distance
+            self._log_and_print(f"Position updated: {axis} {old_position:.3f} → {self.current_position[axis]:.3f}mm")
+
+    def _readline(self, max_bytes: int = 256) -> bytes:
+        """Read one '\n'-terminated line, pulling everything the port has waiting per read call
+        
+        pyserial's readline() fetches one byte per call. Returns b'' if no full
+        line arrives within the port timeout; partial data is kept for next time.
+        Unterminated output (e.g. the firmware's limit back-off counter) is
+        returned in pieces of at most max_bytes.
+        """
+        while True:
+            end = self._rx_buf.find(b'\n', 0, max_bytes)
+            if end >= 0 or len(self._rx_buf) >= max_bytes:
+                size = end + 1 if end >= 0 else max_bytes
+                line = bytes(self._rx_buf[:size])
+                del self._rx_buf[:size]
+                return line
+            chunk = self.arduino.read(self.arduino.in_waiting or 1)
+            if not chunk:
+                return b''
+            self._rx_buf += chunk
+
+    def _drain_input(self) -> str:
+        """Discard and return everything received so far, including buffered partial lines"""
+        data = bytes(self._rx_buf)
+        self._rx_buf.clear()
+        if self.arduino.in_waiting > 0:
+            data += self.arduino.read_all()
+        return data.decode('utf-8', errors='ignore')
+
+    def wait_motion_complete(self, expected_response: str, timeout: float) -> str:
+        """Read Arduino lines until the move is echoed back, a limit is reported, or timeout expires
+        
+        Returns the last non-empty line received ('' if nothing arrived), which
+        equals expected_response for a clean move.
+        """
+        # Compare raw bytes; only lines that are kept get decoded
+        expected = expected_response.encode()
+        deadline = time.time() + timeout
+        line = b''
+        while time.time() < deadline:
+            raw = self._readline().strip()
+            if not raw:
+                continue
+            line = raw
+            lowered = line.lower()
+            if b"limit" in lowered or b"reached" in lowered:
+                break
+            # After a limit back-off the firmware prints its step counter with no
+            # newline, so the echo can arrive as e.g. b"123x+100"
+            if line.endswith(expected):
+                break
+        return line.decode('utf-8', errors='ignore')
+
+    def _wait_ack(self, ack: bytes, timeout: float) -> str:
+        """Collect Arduino reply lines until the command echo arrives or timeout expires"""
+        deadline = time.time() + timeout
+        lines = []
+        while time.time() < deadline:
+            raw = self._readline().strip()
+            if not raw:
+                continue
+            lines.append(raw.decode('utf-8', errors='ignore'))
+            if raw == ack:
+                break
+        return ' '.join(lines)
+
     def enable_motors(self) -> bool:
         """Enable stepper motors"""
         if not self.arduino:
@@ -216,14 +362,11 @@ class MotorController:
             return False
             
         try:
-            command = "<e,+,0>"  # Enable command
-            self.arduino.write(command.encode())
-            self.arduino.flush()
-            time.sleep(0.1)  # Small delay for motor enable
+            self.arduino.write(self._CMD_ENABLE)
             
-            # Clear the response to avoid interference with movement commands
-            if self.arduino.in_waiting > 0:
-                response = self.arduino.read_all().decode('utf-8', errors='ignore').strip()
+            # Consume the reply up to the echo so it can't interfere with movement commands
+            response = self._wait_ack(self._ACK_ENABLE, self.ACK_TIMEOUT_S)
+            if response:
                 self._log_and_print(f"Motor enable response: '{response}'")
             
             return True
@@ -238,14 +381,11 @@ class MotorController:
             return False
             
         try:
-            command = "<d,+,0>"  # Disable command
-            self.arduino.write(command.encode())
-            self.arduino.flush()
-            time.sleep(0.1)  # Small delay for motor disable
+            self.arduino.write(self._CMD_DISABLE)
             
-            # Clear the response to avoid interference with movement commands
-            if self.arduino.in_waiting > 0:
-                response = self.arduino.read_all().decode('utf-8', errors='ignore').strip()
+            # Consume the reply up to the echo so it can't interfere with movement commands
+            response = self._wait_ack(self._ACK_DISABLE, self.ACK_TIMEOUT_S)
+            if response:
                 self._log_and_print(f"Motor disable response: '{response}'")
             
             return True
@@ -261,13 +401,12 @@ class MotorController:
             
         try:
             self._log_and_print("Homing motors...")
-            command = "<h,+,0>"  # Home command
-            self.arduino.write(command.encode())
+            self.arduino.write(self._CMD_HOME)
             self.arduino.flush()
             
             # Wait for homing to complete - this can take a while
             # The Arduino will send a response when done
-            response = self.arduino.readline().decode().strip()
+            response = self._readline().decode().strip()
             self._log_and_print(f"Homing complete: {response}")
             
             # Reset position tracking to center
@@ -295,7 +434,10 @@ class MotorController:
             self._log_and_print(f"Moving to position: {self._format_position(target_position)}")
             self._log_and_print(f"Required movements: {self._format_position(movements)}")
         
-        # Execute movements
+        # Execute movements - several axes go out as one compound command
+        if len(movements) > 1:
+            return self.move_multi(list(movements.items()))
+        
         for axis, delta in movements.items():
             if not self.move_axis(axis, delta):
                 return False
@@ -309,6 +451,11 @@ class MotorController:
     def close(self):
         """Close motor controller connections"""
         print("Closing motor controller connections...")
+        if self._log_handle:
+            self._log_handle.close()
+            self._log_handle = None
+            self.logging_enabled = False
         if self.arduino and self.arduino.is_open:
+            self.arduino.flush()
             self.arduino.close()
             print("Arduino disconnected")
\ No newline at end of file
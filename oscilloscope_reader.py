@@ -7,31 +7,48 @@ import time
 import warnings
 import numpy as np
 import pyvisa
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import os
 
 
 class OscilloscopeReader:
     
+    # Shared VISA ResourceManager - loading the VISA backend is slow, so reuse it across instances
+    _resource_manager: Optional[Any] = None
+    
     def __init__(self, scope_address: str, timeout: int = 15000):
         self.scope_address = scope_address
         self.scope: Optional[Any] = None  # Using Any to avoid pyvisa type issues
         self.scope_settings: Dict[str, Optional[str]] = {}
+        # Waveform scaling parsed from scope_settings, refreshed by _read_settings()
+        self.vdiv_val = 1.0
+        self.offset_val = 0.0
         self.consecutive_errors = 0
         self.timeout = timeout
-        # Tunable delays (can be overridden by environment if needed)
+        # None until the scope has been probed for chained PAVA queries
+        self.batched_peaks_supported: Optional[bool] = None
+        # Last query that answered for each fallback ladder, keyed by the ladder's first method
+        self.working_queries: Dict[str, Tuple[str, str]] = {}
+        # Tunable delays and transfer sizes (can be overridden by environment if needed)
         try:
             self.connect_retry_delay_s = float(os.getenv('SCOPE_CONNECT_RETRY_DELAY_S', '1.0'))
-            self.connect_post_chdr_delay_s = float(os.getenv('SCOPE_POST_CHDR_DELAY_S', '0.5'))
             self.waveform_fetch_delay_s = float(os.getenv('SCOPE_WAVEFORM_FETCH_DELAY_S', '0.5'))
+            self.chunk_size = int(os.getenv('SCOPE_CHUNK_SIZE', '2000000'))
         except Exception:
             self.connect_retry_delay_s = 1.0
-            self.connect_post_chdr_delay_s = 0.5
             self.waveform_fetch_delay_s = 0.5
+            self.chunk_size = 2000000
         
         if scope_address:
             self._connect()
     
+    @classmethod
+    def _get_resource_manager(cls) -> Any:
+        """Return the shared VISA ResourceManager, creating it on first use"""
+        if cls._resource_manager is None:
+            cls._resource_manager = pyvisa.ResourceManager()
+        return cls._resource_manager
+    
     def _connect(self) -> bool:
         """Connect to oscilloscope using robust connection methods"""
         if not self.scope_address:
@@ -44,16 +61,18 @@ class OscilloscopeReader:
             # Suppress USB firmware warnings
             warnings.filterwarnings("ignore", category=UserWarning, module="pyvisa_py")
             
-            rm = pyvisa.ResourceManager()
-            self.scope = rm.open_resource(self.scope_address)
+            self.scope = self._get_resource_manager().open_resource(self.scope_address)
             self.scope.timeout = self.timeout
+            self.batched_peaks_supported = None
+            self.working_queries = {}
             
             # More robust connection with retries
             connected = False
             for attempt in range(3):
                 try:
                     self.scope.write('CHDR OFF')
-                    time.sleep(self.connect_post_chdr_delay_s)
+                    # Returns as soon as the scope has applied the command
+                    self.scope.query('*OPC?')
                     
                     # Test basic communication
                     idn = self.scope.query('*IDN?')
@@ -94,6 +113,27 @@ class OscilloscopeReader:
             'offset': 'C1:OFST?'
         }
         
+        # One chained query instead of a round trip per setting
+        original_timeout = self.scope.timeout
+        try:
+            self.scope.timeout = min(original_timeout, 2000)
+            response = self.scope.query(';'.join(setting_queries.values()))
+            parts = [part.strip() for part in response.replace('\n', ';').split(';') if part.strip()]
+            if len(parts) != len(setting_queries):
+                raise ValueError(f"unexpected reply {response!r}")
+            for setting, value in zip(setting_queries, parts):
+                self.scope_settings[setting] = value
+                print(f"  {setting}: {value}")
+            setting_queries = {}
+        except Exception:
+            # Fall back to individual queries below
+            try:
+                self.scope.clear()
+            except Exception:
+                pass
+        finally:
+            self.scope.timeout = original_timeout
+        
         for setting, query in setting_queries.items():
             try:
                 response = self.scope.query(query)
@@ -102,6 +142,20 @@ class OscilloscopeReader:
             except Exception as e:
                 print(f"  ⚠️  Could not read {setting}: {e}")
                 self.scope_settings[setting] = None
+        
+        # Parse the waveform scaling once here rather than on every waveform fallback
+        self.vdiv_val = self._parse_setting_volts(self.scope_settings.get('vdiv'), 1.0)
+        self.offset_val = self._parse_setting_volts(self.scope_settings.get('offset'), 0.0)
+
+    @staticmethod
+    def _parse_setting_volts(setting: Optional[str], default: float) -> float:
+        """Parse a setting reply such as 'C1:VDIV 5.00E-01V' into volts"""
+        if setting:
+            try:
+                return float(setting.split()[-1].strip('V'))
+            except:
+                pass
+        return default
 
     def is_connected(self) -> bool:
         """Check if oscilloscope is connected"""
@@ -111,6 +165,97 @@ class OscilloscopeReader:
         """Get current oscilloscope settings"""
         return self.scope_settings.copy()
 
+    @staticmethod
+    def _parse_measurement(response: str) -> Optional[float]:
+        """Parse a measurement reply such as 'MAX,1.23E-01V' or a bare number"""
+        if ',' in response:
+            value_str = response.split(',')[1].strip()
+            return float(value_str.rstrip('V'))
+        elif response.replace('.', '').replace('-', '').replace('+', '').replace('e', '').replace('E', '').strip().isdigit():
+            return float(response.strip())
+        return None
+
+    @staticmethod
+    def _parse_waveform_block(raw_data: bytes) -> Optional[np.ndarray]:
+        """View the samples of an IEEE 488.2 definite-length block ('#<n><len><data>')
+        
+        The int8 array is a view into raw_data, so the payload is never copied.
+        """
+        start = raw_data.find(b'#')
+        if start >= 0 and start + 2 < len(raw_data):
+            n_digits = raw_data[start + 1] - 0x30  # ASCII digit -> int
+            header_end = start + 2 + n_digits
+            if 0 < n_digits <= 9 and header_end <= len(raw_data):
+                length = int(raw_data[start + 2:header_end])
+                count = min(length, len(raw_data) - header_end)
+                return np.frombuffer(raw_data, dtype=np.int8, count=count, offset=header_end)
+        
+        # Fall back to a fixed header for replies without a block marker
+        if len(raw_data) > 16:
+            return np.frombuffer(raw_data, dtype=np.int8, count=len(raw_data) - 17, offset=16)
+        return None
+
+    def _query_peaks_batched(self) -> Optional[Tuple[float, float, float]]:
+        """Read PAVA MAX, MIN and PKPK in a single chained query
+        
+        Returns None if the scope does not answer chained queries; that is
+        remembered so later samples go straight to the individual queries.
+        Also returns None (without disabling the fast path) when the scope
+        answers but has no valid value yet for one of the peaks.
+        """
+        if self.batched_peaks_supported is False:
+            return None
+        
+        original_timeout = self.scope.timeout
+        try:
+            # Keep the probe short in case the firmware ignores chained queries
+            if self.batched_peaks_supported is None:
+                self.scope.timeout = min(original_timeout, 2000)
+            response = self.scope.query('C1:PAVA? MAX;C1:PAVA? MIN;C1:PAVA? PKPK')
+            parts = [part for part in response.replace('\n', ';').split(';') if part.strip()]
+            if len(parts) != 3:
+                raise ValueError(f"unexpected reply {response!r}")
+            # Three answers means chained queries work; a value the scope couldn't
+            # measure yet (e.g. 'MAX,****') only sends this sample to the individual queries
+            self.batched_peaks_supported = True
+            try:
+                values = [self._parse_measurement(part) for part in parts]
+            except ValueError:
+                return None
+            if None in values:
+                return None
+            return values[0], values[1], values[2]
+        except Exception:
+            if self.batched_peaks_supported is None:
+                self.batched_peaks_supported = False
+                try:
+                    self.scope.clear()
+                except Exception:
+                    pass
+            return None
+        finally:
+            self.scope.timeout = original_timeout
+
+    def _query_first(self, methods: List[Tuple[str, str]]) -> Tuple[Optional[float], Optional[str]]:
+        """Try (method_name, command) queries in order; return the first parsed value and its method
+        
+        The query that answered last time for this ladder is tried first, so a
+        scope that rejects the primary command doesn't pay for it on every sample.
+        """
+        ladder = methods[0][0]
+        preferred = self.working_queries.get(ladder)
+        if preferred:
+            methods = [preferred] + [method for method in methods if method != preferred]
+        for method_name, command in methods:
+            try:
+                value = self._parse_measurement(self.scope.query(command))
+            except Exception:
+                continue
+            if value is not None:
+                self.working_queries[ladder] = (method_name, command)
+                return value, method_name
+        return None, None
+
     def sample_voltage_detailed(self) -> Optional[Dict[str, Any]]:
         """Sample voltage with detailed breakdown: positive peak, negative peak, and peak-to-peak"""
         if not self.scope:
@@ -124,6 +269,12 @@ class OscilloscopeReader:
             vpp = None
             method_used = None
             
+            # Fast path: all three PAVA values in one round-trip
+            batched = self._query_peaks_batched()
+            if batched:
+                pos_peak, neg_peak, vpp = batched
+                method_used = 'PAVA_MAX'
+            
             # Try to get positive peak
             pos_peak_methods = [
                 ('PAVA_MAX', 'C1:PAVA? MAX'),
@@ -131,20 +282,10 @@ class OscilloscopeReader:
                 ('PARA_MAX', 'PARA? C1,MAX')
             ]
             
-            for method_name, command in pos_peak_methods:
-                try:
-                    response = self.scope.query(command)
-                    if ',' in response:
-                        value_str = response.split(',')[1].strip()
-                        pos_peak = float(value_str.rstrip('V'))
-                        method_used = method_name
-                        break
-                    elif response.replace('.', '').replace('-', '').replace('+', '').replace('e', '').replace('E', '').isdigit():
-                        pos_peak = float(response.strip())
-                        method_used = method_name
-                        break
-                except Exception:
-                    continue
+            if pos_peak is None:
+                pos_peak, method_name = self._query_first(pos_peak_methods)
+                if pos_peak is not None:
+                    method_used = method_name
             
             # Try to get negative peak
             neg_peak_methods = [
@@ -153,18 +294,8 @@ class OscilloscopeReader:
                 ('PARA_MIN', 'PARA? C1,MIN')
             ]
             
-            for method_name, command in neg_peak_methods:
-                try:
-                    response = self.scope.query(command)
-                    if ',' in response:
-                        value_str = response.split(',')[1].strip()
-                        neg_peak = float(value_str.rstrip('V'))
-                        break
-                    elif response.replace('.', '').replace('-', '').replace('+', '').replace('e', '').replace('E', '').isdigit():
-                        neg_peak = float(response.strip())
-                        break
-                except Exception:
-                    continue
+            if neg_peak is None:
+                neg_peak, _ = self._query_first(neg_peak_methods)
             
             # Try to get peak-to-peak
             vpp_methods = [
@@ -173,22 +304,11 @@ class OscilloscopeReader:
                 ('PARA_PKPK', 'PARA? C1,PKPK')
             ]
             
-            for method_name, command in vpp_methods:
-                try:
-                    response = self.scope.query(command)
-                    if ',' in response:
-                        value_str = response.split(',')[1].strip()
-                        vpp = float(value_str.rstrip('V'))
-                        if not method_used:
-                            method_used = method_name
-                        break
-                    elif response.replace('.', '').replace('-', '').replace('+', '').replace('e', '').replace('E', '').isdigit():
-                        vpp = float(response.strip())
-                        if not method_used:
-                            method_used = method_name
-                        break
-                except Exception:
-                    continue
+            # PKPK is MAX - MIN, so only ask for it when a peak is still missing
+            if vpp is None and (pos_peak is None or neg_peak is None):
+                vpp, method_name = self._query_first(vpp_methods)
+                if vpp is not None and not method_used:
+                    method_used = method_name
             
             # If individual peaks failed, try waveform method
             if pos_peak is None or neg_peak is None:
@@ -196,46 +316,24 @@ class OscilloscopeReader:
                     self.scope.write('C1:WF? DAT1')
                     time.sleep(self.waveform_fetch_delay_s)
                     
-                    raw_data = self.scope.read_raw()
+                    # Large chunk only for the waveform block so it arrives in one low-level
+                    # read; text queries keep the session's default chunk size
+                    raw_data = self.scope.read_raw(self.chunk_size)
                     
                     if len(raw_data) > 10:
                         # Try to parse waveform data
                         data = None
                         try:
-                            if b'#9' in raw_data:
-                                header_end = raw_data.find(b'#9') + 11
-                                data_bytes = raw_data[header_end:-1]
-                                data = np.frombuffer(data_bytes, dtype=np.int8)
-                            elif len(raw_data) > 16:
-                                data_bytes = raw_data[16:-1]
-                                data = np.frombuffer(data_bytes, dtype=np.int8)
+                            data = self._parse_waveform_block(raw_data)
                         except:
                             pass
                         
                         if data is not None and len(data) > 0:
-                            # Get current scaling
-                            vdiv_val = 1.0
-                            offset_val = 0.0
-                            
-                            vdiv_setting = self.scope_settings.get('vdiv')
-                            if vdiv_setting:
-                                try:
-                                    vdiv_val = float(vdiv_setting.split()[-1].strip('V'))
-                                except:
-                                    pass
-                            
-                            offset_setting = self.scope_settings.get('offset')
-                            if offset_setting:
-                                try:
-                                    offset_val = float(offset_setting.split()[-1].strip('V'))
-                                except:
-                                    pass
-                            
-                            # Convert to voltage
-                            voltage_array = (data / 25.0) * vdiv_val + offset_val
-                            
-                            pos_peak = np.max(voltage_array)
-                            neg_peak = np.min(voltage_array)
+                            # Scaling is monotonic (vdiv > 0), so reduce the raw int8 samples
+                            # and convert only the two extremes with the cached scaling
+                            volts_per_code = self.vdiv_val / 25.0
+                            pos_peak = int(data.max()) * volts_per_code + self.offset_val
+                            neg_peak = int(data.min()) * volts_per_code + self.offset_val
                             vpp = pos_peak - neg_peak
                             method_used = 'WAVEFORM'
                 
@@ -5,7 +5,6 @@ Handles data visualization and analysis of scan results.
 
 import csv
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -268,7 +267,8 @@ class ScanPostProcessor:
             y_idx = y_to_idx[d[y_axis]]
             pos_grid_pressure[y_idx, x_idx] = d['pos_peak'] / self.calibration_value
         
-        # Create the heatmap plot
+        # Create the heatmap plot (pyplot is only imported once there is something to draw)
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(10, 8))
         
         vmin = min(pos_peaks_pressure)
@@ -309,6 +309,7 @@ class ScanPostProcessor:
                            values: List[float], x_axis: str, y_axis: str, voltage_type: str, 
                            scan_dir: Path, data: List[Dict[str, Optional[float]]], unit_type: str = 'voltage') -> None:
         """Create a single heatmap plot"""
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(10, 8))
         
         vmin = min(values)
@@ -108,6 +108,20 @@ class ScanDataCollector:
         print(f"✅ Data saved to {csv_file}")
 
 class Scanner:
+
+    # Interactive command reference, written in one call for the banner and 'help'
+    _COMMANDS_HELP = "\n".join([
+        "Commands:",
+        "  x+/x-/y+/y-/z+/z- <distance>  - Move axis by distance in mm",
+        "  m                              - Take single voltage measurement",
+        "  sample                         - Start continuous voltage sampling",
+        "  scan                           - Start automated area scan",
+        "  status                         - Show system status",
+        "  r                              - Repeat previous movement",
+        "  help                           - Show this help",
+        "  quit/exit                      - Exit interactive mode",
+    ]) + "\n"
+
     def __init__(self, config_path: str = 'config.yaml'):
         """Initialize hydrophone scanner with configuration"""
         try:
@@ -149,70 +163,35 @@ class Scanner:
         
         self.oscilloscope.continuous_sampling()
 
+    @staticmethod
+    def _axis_offsets(distance: float, increment: float):
+        """Offsets from 0 to distance (inclusive) in increment steps, signed to match distance"""
+        if distance == 0:
+            return [0]
+        if distance > 0:
+            return np.arange(0, distance + increment/2, increment)
+        return np.arange(0, distance - increment/2, -increment)
+
     def generate_scan_points(self, axes: str, distances: Dict[str, float], increment: float, start_pos: Dict[str, float]) -> List[Dict[str, float]]:
         """Generate scan points using snake/raster pattern for efficient scanning"""
         points = []
         
         if axes == 'x':
-            distance = distances['x']
-            if distance == 0:
-                points.append({'x': start_pos['x'], 'y': start_pos['y'], 'z': start_pos['z']})
-            else:
-                # Generate points from 0 to distance with proper step direction
-                if distance > 0:
-                    x_vals = np.arange(0, distance + increment/2, increment)
-                else:
-                    x_vals = np.arange(0, distance - increment/2, -increment)
-                
-                for x_offset in x_vals:
-                    points.append({'x': start_pos['x'] + x_offset, 'y': start_pos['y'], 'z': start_pos['z']})
+            for x_offset in self._axis_offsets(distances['x'], increment):
+                points.append({'x': start_pos['x'] + x_offset, 'y': start_pos['y'], 'z': start_pos['z']})
                 
         elif axes == 'y':
-            distance = distances['y']
-            if distance == 0:
-                points.append({'x': start_pos['x'], 'y': start_pos['y'], 'z': start_pos['z']})
-            else:
-                if distance > 0:
-                    y_vals = np.arange(0, distance + increment/2, increment)
-                else:
-                    y_vals = np.arange(0, distance - increment/2, -increment)
-                
-                for y_offset in y_vals:
-                    points.append({'x': start_pos['x'], 'y': start_pos['y'] + y_offset, 'z': start_pos['z']})
+            for y_offset in self._axis_offsets(distances['y'], increment):
+                points.append({'x': start_pos['x'], 'y': start_pos['y'] + y_offset, 'z': start_pos['z']})
                 
         elif axes == 'z':
-            distance = distances['z']
-            if distance == 0:
-                points.append({'x': start_pos['x'], 'y': start_pos['y'], 'z': start_pos['z']})
-            else:
-                if distance > 0:
-                    z_vals = np.arange(0, distance + increment/2, increment)
-                else:
-                    z_vals = np.arange(0, distance - increment/2, -increment)
-                
-                for z_offset in z_vals:
-                    points.append({'x': start_pos['x'], 'y': start_pos['y'], 'z': start_pos['z'] + z_offset})
+            for z_offset in self._axis_offsets(distances['z'], increment):
+                points.append({'x': start_pos['x'], 'y': start_pos['y'], 'z': start_pos['z'] + z_offset})
                 
         elif axes == 'xy':
             # Snake pattern for XY scan
-            x_distance = distances['x']
-            y_distance = distances['y']
-            
-            # Generate X values
-            if x_distance == 0:
-                x_vals = [0]
-            elif x_distance > 0:
-                x_vals = np.arange(0, x_distance + increment/2, increment)
-            else:
-                x_vals = np.arange(0, x_distance - increment/2, -increment)
-            
-            # Generate Y values
-            if y_distance == 0:
-                y_vals = [0]
-            elif y_distance > 0:
-                y_vals = np.arange(0, y_distance + increment/2, increment)
-            else:
-                y_vals = np.arange(0, y_distance - increment/2, -increment)
+            x_vals = self._axis_offsets(distances['x'], increment)
+            y_vals = self._axis_offsets(distances['y'], increment)
             
             # Create snake pattern: alternate X direction for each Y row
             for i, y_offset in enumerate(y_vals):
@@ -228,24 +207,8 @@ class Scanner:
                     
         elif axes == 'yx':
             # Snake pattern for YX scan (Y first, then X - opposite of XY)
-            x_distance = distances['x']
-            y_distance = distances['y']
-            
-            # Generate X values
-            if x_distance == 0:
-                x_vals = [0]
-            elif x_distance > 0:
-                x_vals = np.arange(0, x_distance + increment/2, increment)
-            else:
-                x_vals = np.arange(0, x_distance - increment/2, -increment)
-            
-            # Generate Y values
-            if y_distance == 0:
-                y_vals = [0]
-            elif y_distance > 0:
-                y_vals = np.arange(0, y_distance + increment/2, increment)
-            else:
-                y_vals = np.arange(0, y_distance - increment/2, -increment)
+            x_vals = self._axis_offsets(distances['x'], increment)
+            y_vals = self._axis_offsets(distances['y'], increment)
             
             # Create snake pattern: alternate Y direction for each X row (opposite of XY)
             for i, x_offset in enumerate(x_vals):
@@ -261,24 +224,8 @@ class Scanner:
                     
         elif axes == 'xz':
             # Snake pattern for XZ scan
-            x_distance = distances['x']
-            z_distance = distances['z']
-            
-            # Generate X values
-            if x_distance == 0:
-                x_vals = [0]
-            elif x_distance > 0:
-                x_vals = np.arange(0, x_distance + increment/2, increment)
-            else:
-                x_vals = np.arange(0, x_distance - increment/2, -increment)
-            
-            # Generate Z values
-            if z_distance == 0:
-                z_vals = [0]
-            elif z_distance > 0:
-                z_vals = np.arange(0, z_distance + increment/2, increment)
-            else:
-                z_vals = np.arange(0, z_distance - increment/2, -increment)
+            x_vals = self._axis_offsets(distances['x'], increment)
+            z_vals = self._axis_offsets(distances['z'], increment)
             
             # Create snake pattern: alternate X direction for each Z row
             for i, z_offset in enumerate(z_vals):
@@ -294,24 +241,8 @@ class Scanner:
                     
         elif axes == 'yz':
             # Snake pattern for YZ scan
-            y_distance = distances['y']
-            z_distance = distances['z']
-            
-            # Generate Y values
-            if y_distance == 0:
-                y_vals = [0]
-            elif y_distance > 0:
-                y_vals = np.arange(0, y_distance + increment/2, increment)
-            else:
-                y_vals = np.arange(0, y_distance - increment/2, -increment)
-            
-            # Generate Z values
-            if z_distance == 0:
-                z_vals = [0]
-            elif z_distance > 0:
-                z_vals = np.arange(0, z_distance + increment/2, increment)
-            else:
-                z_vals = np.arange(0, z_distance - increment/2, -increment)
+            y_vals = self._axis_offsets(distances['y'], increment)
+            z_vals = self._axis_offsets(distances['z'], increment)
             
             # Create snake pattern: alternate Y direction for each Z row
             for i, z_offset in enumerate(z_vals):
@@ -327,24 +258,8 @@ class Scanner:
             
         elif axes == 'zy':
             # Snake pattern for ZY scan (Z first, then Y)
-            y_distance = distances['y']
-            z_distance = distances['z']
-            
-            # Generate Z values
-            if z_distance == 0:
-                z_vals = [0]
-            elif z_distance > 0:
-                z_vals = np.arange(0, z_distance + increment/2, increment)
-            else:
-                z_vals = np.arange(0, z_distance - increment/2, -increment)
-            
-            # Generate Y values
-            if y_distance == 0:
-                y_vals = [0]
-            elif y_distance > 0:
-                y_vals = np.arange(0, y_distance + increment/2, increment)
-            else:
-                y_vals = np.arange(0, y_distance - increment/2, -increment)
+            z_vals = self._axis_offsets(distances['z'], increment)
+            y_vals = self._axis_offsets(distances['y'], increment)
             
             # Create snake pattern: alternate Z direction for each Y row
             for i, y_offset in enumerate(y_vals):
@@ -360,33 +275,9 @@ class Scanner:
             
         elif axes == 'xyz':
             # Snake pattern for XYZ scan
-            x_distance = distances['x']
-            y_distance = distances['y']
-            z_distance = distances['z']
-            
-            # Generate X values
-            if x_distance == 0:
-                x_vals = [0]
-            elif x_distance > 0:
-                x_vals = np.arange(0, x_distance + increment/2, increment)
-            else:
-                x_vals = np.arange(0, x_distance - increment/2, -increment)
-            
-            # Generate Y values
-            if y_distance == 0:
-                y_vals = [0]
-            elif y_distance > 0:
-                y_vals = np.arange(0, y_distance + increment/2, increment)
-            else:
-                y_vals = np.arange(0, y_distance - increment/2, -increment)
-            
-            # Generate Z values
-            if z_distance == 0:
-                z_vals = [0]
-            elif z_distance > 0:
-                z_vals = np.arange(0, z_distance + increment/2, increment)
-            else:
-                z_vals = np.arange(0, z_distance - increment/2, -increment)
+            x_vals = self._axis_offsets(distances['x'], increment)
+            y_vals = self._axis_offsets(distances['y'], increment)
+            z_vals = self._axis_offsets(distances['z'], increment)
             
             # Create 3D snake pattern: alternate XY plane direction for each Z layer
             for k, z_offset in enumerate(z_vals):
@@ -746,19 +637,9 @@ class Scanner:
 
     def interactive_mode(self):
         """Interactive CLI mode for manual control"""
-        print("\n" + "="*60)
-        print("INTERACTIVE SCANNER CONTROL")
-        print("="*60)
-        print("Commands:")
-        print("  x+/x-/y+/y-/z+/z- <distance>  - Move axis by distance in mm")
-        print("  m                              - Take single voltage measurement")
-        print("  sample                         - Start continuous voltage sampling")
-        print("  scan                           - Start automated area scan")
-        print("  status                         - Show system status")
-        print("  r                              - Repeat previous movement")
-        print("  help                           - Show this help")
-        print("  quit/exit                      - Exit interactive mode")
-        print("="*60)
+        rule = "=" * 60
+        sys.stdout.write(f"\n{rule}\nINTERACTIVE SCANNER CONTROL\n{rule}\n{self._COMMANDS_HELP}{rule}\n")
+        sys.stdout.flush()
         
         last_movement_cmd = None
         
@@ -772,14 +653,7 @@ class Scanner:
                     break
                     
                 elif cmd[0] == 'help':
-                    print("\nCommands:")
-                    print("  x+/x-/y+/y-/z+/z- <distance>  - Move axis by distance in mm")
-                    print("  m                              - Take single voltage measurement")
-                    print("  sample                         - Start continuous voltage sampling")
-                    print("  scan                           - Start automated area scan")
-                    print("  status                         - Show system status")
-                    print("  r                              - Repeat previous movement")
-                    print("  quit/exit                      - Exit")
+                    sys.stdout.write("\n" + self._COMMANDS_HELP)
                     
                 elif cmd[0] == 'r':
                     if last_movement_cmd is None:
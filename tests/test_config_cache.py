@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for load_config's mtime-keyed cache (no hardware required)
+"""
+
+import sys
+import os
+
+# Add the repository root to Python path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import config
+from config import load_config
+
+CONFIG_TEMPLATE = """
+scan:
+  type: '1d_y'
+  dimensions:
+    x: 0
+    y: {y}
+    z: 0
+    resolution: 0.5
+  calibration_value: 0.2545
+  base_path: '{base_path}'
+"""
+
+
+def write_config(path, y, mtime_ns):
+    path.write_text(CONFIG_TEMPLATE.format(y=y, base_path=path.parent / 'scan_data'))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_cache_hit_returns_copy(tmp_path, monkeypatch):
+    config_file = tmp_path / 'config.yaml'
+    write_config(config_file, 2, 1_000_000_000)
+
+    first = load_config(str(config_file))
+    first['scan']['dimensions']['y'] = 99
+    # An unchanged file must not be parsed again
+    monkeypatch.setattr(config.yaml, 'load', lambda *args, **kwargs: pytest.fail("config re-parsed"))
+    second = load_config(str(config_file))
+
+    assert second['scan']['dimensions']['y'] == 2
+    assert second is not first
+    assert len([key for key in config._CACHE if key[0] == str(config_file)]) == 1
+
+
+def test_cache_invalidated_on_mtime_change(tmp_path):
+    config_file = tmp_path / 'config.yaml'
+    write_config(config_file, 2, 1_000_000_000)
+    assert load_config(str(config_file))['scan']['dimensions']['y'] == 2
+
+    write_config(config_file, 4, 2_000_000_000)
+    assert load_config(str(config_file))['scan']['dimensions']['y'] == 4
+    # The entry for the old mtime is dropped
+    assert [key[1] for key in config._CACHE if key[0] == str(config_file)] == [2_000_000_000]
+
+
+def test_cache_hit_recreates_base_path(tmp_path):
+    config_file = tmp_path / 'config.yaml'
+    write_config(config_file, 2, 1_000_000_000)
+    base_path = tmp_path / 'scan_data'
+
+    load_config(str(config_file))
+    assert base_path.is_dir()
+    base_path.rmdir()
+
+    load_config(str(config_file))
+    assert base_path.is_dir()
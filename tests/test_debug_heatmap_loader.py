@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for debug_heatmap's CSV loader (no hardware required)
+"""
+
+import sys
+import os
+
+# Add the repository root to Python path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from debug_heatmap import _load_scan_data
+
+HEADER = "point_num,x_mm,y_mm,z_mm,positive_peak_v,negative_peak_v,method\n"
+
+
+def test_skips_failed_rows_and_missing_peaks(tmp_path):
+    csv_file = tmp_path / 'scan_data.csv'
+    csv_file.write_text(HEADER +
+                        "1,0.0,0.0,0.0,0.10,-0.10,PAVA_MAX\n"
+                        "2,0.5,0.0,0.0,None,-0.20,PAVA_MAX\n"
+                        "3,1.0,0.0,0.0,,,WAVEFORM\n"
+                        "4,1.5,0.0,0.0,0.40,-0.40,FAILED\n"
+                        "5,None,0.0,0.0,0.50,-0.50,PAVA_MAX\n")
+
+    data = _load_scan_data(csv_file)
+
+    # FAILED row and the row with an unreadable coordinate are dropped
+    assert data['point_num'].tolist() == [1, 2, 3]
+    assert data['x'].tolist() == [0.0, 0.5, 1.0]
+    # 'None' and empty peaks become NaN
+    np.testing.assert_array_equal(data['pos_peak'], [0.10, np.nan, np.nan])
+    np.testing.assert_array_equal(data['neg_peak'], [-0.10, -0.20, np.nan])
+
+
+def test_header_only_file(tmp_path):
+    csv_file = tmp_path / 'scan_data.csv'
+    csv_file.write_text(HEADER)
+
+    data = _load_scan_data(csv_file)
+
+    assert data['point_num'].size == 0
+    assert data['x'].dtype == np.float64
+
+
+def test_skips_truncated_and_unparsable_rows(tmp_path):
+    """A scan interrupted mid-write leaves a short last line; the rest still loads"""
+    csv_file = tmp_path / 'scan_data.csv'
+    csv_file.write_text(HEADER +
+                        "1,0.0,0.0,0.0,0.10,-0.10,PAVA_MAX\n"
+                        "2,0.5,0.0,0.0,0.1x,-0.20,PAVA_MAX\n"
+                        "3,1.0,0.0,0.0,0.30,-0.30,PAVA_MAX\n"
+                        "4,1.5,0.0")
+
+    data = _load_scan_data(csv_file)
+
+    assert data['point_num'].tolist() == [1, 3]
+    assert data['pos_peak'].tolist() == [0.10, 0.30]
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the move command protocol against a fake Arduino port (no hardware required)
+"""
+
+import sys
+import os
+import re
+
+# Add the repository root to Python path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import serial
+
+import motor_controller
+from motor_controller import MotorController
+
+CONFIG = {'hardware': {'steps_per_mm': {'x': 100, 'y': 100, 'z': 100}}}
+
+
+class FakeArduino:
+    """Serial port stand-in replying like arduino.ino; `replies` overrides the reply per command"""
+
+    def __init__(self, *args, **kwargs):
+        self.rx = bytearray(b"Arduino is ready\r")
+        self.written = []
+        self.replies = {}
+        self.is_open = True
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.rx)
+
+    def read(self, size: int = 1) -> bytes:
+        data = bytes(self.rx[:size])
+        del self.rx[:size]
+        return data
+
+    def read_all(self) -> bytes:
+        return self.read(len(self.rx))
+
+    def write(self, data: bytes) -> int:
+        self.written.append(bytes(data))
+        fields = re.fullmatch(rb"<(.*)>", data).group(1).split(b',')
+        if data in self.replies:
+            self.rx += self.replies[data]
+        elif fields[0] == b'M':
+            self.rx += b"M%d\n\r\n" % ((len(fields) - 1) // 3)
+        else:
+            if fields[0] == b'd':
+                self.rx += b"Motors disabled\n"
+            self.rx += b"".join(fields) + b"\n\r\n"
+        return len(data)
+
+    def close(self):
+        self.is_open = False
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(serial, 'Serial', FakeArduino)
+    monkeypatch.setattr(motor_controller.tqdm, 'write', lambda *args, **kwargs: None)
+    return MotorController('/dev/null', config=CONFIG)
+
+
+def test_compound_move_completes(controller):
+    assert controller.move_multi([('x', 1.0), ('y', -0.5)])
+    assert controller.arduino.written[-1] == b"<M,x,+,100,y,-,50>"
+    assert controller.current_position == {'x': 1.0, 'y': -0.5, 'z': 0.0}
+
+
+def test_compound_move_limit_tracks_finished_moves(controller):
+    # y hits its limit: x finished, y stopped part way, z never ran
+    controller.arduino.replies[b"<M,x,+,100,y,+,200,z,+,300>"] = b"45M1 limit reached\n\r\n"
+    assert not controller.move_multi([('x', 1.0), ('y', 2.0), ('z', 3.0)])
+    assert controller.current_position == {'x': 1.0, 'y': 0.0, 'z': 0.0}
+
+
+def test_compound_move_limit_on_first_move(controller):
+    controller.arduino.replies[b"<M,x,-,100,y,+,100>"] = b"-x reached12M0 limit reached\n\r\n"
+    assert not controller.move_multi([('x', -1.0), ('y', 1.0)])
+    assert controller.current_position == {'x': 0.0, 'y': 0.0, 'z': 0.0}
+
+
+def test_bare_limit_reply(controller):
+    controller.arduino.replies[b"<x,-,100>"] = b"-x reached\n"
+    assert not controller.move_axis('x', -1.0)
+    assert controller.current_position['x'] == 0.0
+
+
+def test_single_axis_limit_reported(controller):
+    controller.arduino.replies[b"<y,+,100>"] = b"y+100 limit reached\n\r\n"
+    assert not controller.move_axis('y', 1.0)
+    assert controller.current_position['y'] == 0.0
+
+
+def test_echo_after_counter_accepted(controller):
+    controller.arduino.replies[b"<z,+,100>"] = b"123z+100\n\r\n"
+    assert controller.move_axis('z', 1.0)
+    assert controller.current_position['z'] == 1.0
+
+
+def test_too_many_compound_moves(controller):
+    with pytest.raises(ValueError):
+        controller.move_multi([('x', 1.0), ('y', 1.0), ('z', 1.0), ('x', 1.0)])
+    assert controller.current_position == {'x': 0.0, 'y': 0.0, 'z': 0.0}
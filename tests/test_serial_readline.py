@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for MotorController's buffered serial line reader (no Arduino required)
+"""
+
+import sys
+import os
+
+# Add the repository root to Python path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor_controller import MotorController
+
+
+class FakePort:
+    """Serial port stand-in that hands out pre-queued chunks, then times out with b''"""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = list(chunks)
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def read(self, size: int = 1) -> bytes:
+        return self.chunks.pop(0) if self.chunks else b''
+
+
+def make_controller(*chunks: bytes) -> MotorController:
+    """MotorController with a fake port, skipping the connection handshake in __init__"""
+    controller = MotorController.__new__(MotorController)
+    controller.arduino = FakePort(*chunks)
+    controller._rx_buf = bytearray()
+    return controller
+
+
+def test_splits_lines_across_reads():
+    controller = make_controller(b"x+100\n\r", b"\ny-5", b"0\n")
+    assert controller._readline() == b"x+100\n"
+    assert controller._readline() == b"\r\n"
+    assert controller._readline() == b"y-50\n"
+    assert controller._readline() == b""
+
+
+def test_partial_line_kept_for_next_call():
+    controller = make_controller(b"Motors ena")
+    assert controller._readline() == b""
+    controller.arduino.chunks.append(b"bled\n")
+    assert controller._readline() == b"Motors enabled\n"
+
+
+def test_unterminated_output_returned_in_pieces():
+    """The limit back-off counter has no newline; it must not grow the buffer forever"""
+    controller = make_controller(b"1234567891011")
+    assert controller._readline(max_bytes=5) == b"12345"
+    assert controller._readline(max_bytes=5) == b"67891"
+    assert controller._readline(max_bytes=5) == b""
+    assert controller._drain_input() == "011"
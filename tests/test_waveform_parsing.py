@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for the oscilloscope reply parsers (no scope required)
+"""
+
+import sys
+import os
+
+# Add the repository root to Python path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from oscilloscope_reader import OscilloscopeReader
+
+
+def test_block_with_command_prefix():
+    """Samples start after the '#9<length>' header, whatever precedes it"""
+    raw = b"C1:WF DAT2,#9000000004" + bytes([1, 2, 254, 255]) + b"\n\n"
+    data = OscilloscopeReader._parse_waveform_block(raw)
+    assert data.dtype == np.int8
+    assert data.tolist() == [1, 2, -2, -1]
+
+
+def test_block_truncated_payload():
+    """A payload shorter than the header's length returns only the bytes received"""
+    raw = b"#9000000010" + bytes([5, 6, 7])
+    data = OscilloscopeReader._parse_waveform_block(raw)
+    assert data.tolist() == [5, 6, 7]
+
+
+def test_block_without_marker_uses_fixed_header():
+    """Replies without '#' skip the 16-byte header and the trailing terminator"""
+    raw = bytes(16) + bytes([10, 20, 30]) + b"\n"
+    data = OscilloscopeReader._parse_waveform_block(raw)
+    assert data.tolist() == [10, 20, 30]
+    assert OscilloscopeReader._parse_waveform_block(b"no block") is None
+
+
+def test_parse_measurement():
+    assert OscilloscopeReader._parse_measurement("MAX,1.23E-01V\n") == pytest.approx(0.123)
+    assert OscilloscopeReader._parse_measurement("-2.5E-02\n") == pytest.approx(-0.025)
+    assert OscilloscopeReader._parse_measurement("garbage") is None
+    # No valid measurement yet
+    with pytest.raises(ValueError):
+        OscilloscopeReader._parse_measurement("MAX,****")